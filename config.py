@@ -21,4 +21,60 @@ COLOR_CONFIG = {
 # Configurações para o relatório de sessão
 LOG_CONFIG = {
     'dir_logs': 'logs'
-}
\ No newline at end of file
+}
+
+# Configurações para a exportação do vídeo anotado
+EXPORT_CONFIG = {
+    'codec': 'mp4v',        # Código FourCC do codec de saída
+    'resolution': None,     # (largura, altura) de saída; None mantém a resolução original
+    'frame_step': 1,        # Exporta um a cada N frames (decimação)
+    'queue_size': 64,       # Máximo de frames aguardando a thread de escrita
+    'fps_measure_frames': 30,   # Frames usados para medir a taxa real do loop em fontes ao vivo (webcam)
+    'default_fps': 30.0     # Usado quando a fonte não informa o FPS e a taxa não pode ser medida
+}
+
+# Configurações para o endpoint local de métricas (formato Prometheus)
+METRICS_CONFIG = {
+    'host': '127.0.0.1',    # Apenas acesso local por padrão
+    # Limites (em segundos) dos buckets dos histogramas de latência por etapa
+    'latency_buckets': [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+}
+
+# Configurações para a varredura de parâmetros (sweep.py)
+SWEEP_CONFIG = {
+    # Grade padrão; parâmetros ausentes usam o valor do template do exercício
+    'grid': {
+        'R': [5, 10, 20],
+        'Q': [0.1, 0.5, 1.0],
+        'visibility_threshold': [0.5, 0.65, 0.8]
+    },
+    'top': 10   # Quantidade de configurações exibidas no ranking
+}
+
+# Configurações para o reconhecimento automático do exercício (--auto)
+MULTI_TEMPLATE_CONFIG = {
+    'templates_dir': 'exercise_templates',
+    'recognition_reps': 3,          # Ciclos do ângulo principal, na janela, para reconhecer o exercício
+    'recognition_margin': 2,        # Vantagem mínima, em ciclos, sobre o segundo colocado (ou o template ativo)
+    'recognition_window_frames': 450,   # Janela de contagem dos ciclos (~15s a 30 FPS)
+    'replay_frames_per_frame': 15,  # Frames da janela reprocessados por frame após o reconhecimento (~1s para 450)
+    # Parâmetros do filtro até o reconhecimento; depois, são usados os do template reconhecido
+    'kalman_filter_params': {'R': 5, 'Q': 0.1}
+}
+
+# Configurações do modo de espera (apenas webcam, quando não há pessoa em frente à câmera)
+IDLE_CONFIG = {
+    'enabled': True,
+    'idle_after_s': 10.0,           # Tempo sem detecção para entrar no modo de espera
+    'detect_every_n_frames': 15,    # No modo de espera, executa o detector uma vez a cada N frames
+    'pixel_threshold': 25,          # Diferença (0-255) a partir da qual um pixel é considerado alterado
+    'motion_fraction': 0.01,        # Fração de pixels alterados em relação à referência que acorda o detector
+    'downscale_size': (64, 36)      # (largura, altura) dos frames usados na detecção de movimento
+}
+
+# Configurações para a extração de clipes das repetições (extract_clips.py)
+CLIP_CONFIG = {
+    'output_dir': 'clips',
+    'padding_s': 0.5,       # Margem, em segundos, antes e depois de cada repetição
+    'codec': 'mp4v'         # Usado apenas quando o ffmpeg não está disponível e o OpenCV recodifica o trecho
+}
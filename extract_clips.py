@@ -0,0 +1,36 @@
+import argparse
+
+from src.rep_clips import load_rep_index, select_reps, extract_rep_clips
+from config import CLIP_CONFIG
+
+def main(video_path, index_path, output_dir, include_all=False, use_ffmpeg=True):
+    """
+    Extrai clipes das repetições de uma sessão usando o índice de repetições do relatório,
+    indo direto ao trecho de cada rep sem percorrer o vídeo inteiro.
+    Sem 'video_path', usa o vídeo registrado no índice (o vídeo analisado ou o exportado da webcam).
+    """
+    index_video, reps = load_rep_index(index_path)
+    video_path = video_path or index_video
+    if not video_path:
+        raise ValueError(f"O índice {index_path} não informa o vídeo da sessão; use --video.")
+
+    reps = select_reps(reps, only_flagged=not include_all)
+    if not reps:
+        print("Nenhuma repetição com erro encontrada no índice.")
+        return
+
+    clips = extract_rep_clips(video_path, reps, output_dir, padding_s=CLIP_CONFIG['padding_s'],
+                              codec=CLIP_CONFIG['codec'], use_ffmpeg=use_ffmpeg)
+    print(f">>> {len(clips)} clipe(s) salvo(s) em {output_dir}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extração de clipes das repetições de uma sessão.')
+    parser.add_argument('--video', type=str, help='Vídeo da sessão. Padrão: o vídeo registrado no índice.')
+    parser.add_argument('--index', type=str, required=True, help='Caminho para o índice de repetições (logs/indice_reps_*.json).')
+    parser.add_argument('--output', type=str, default=CLIP_CONFIG['output_dir'], help='Pasta de saída dos clipes.')
+    parser.add_argument('--all', action='store_true', help='Extrai todas as repetições, e não apenas as que tiveram erro.')
+    parser.add_argument('--no-ffmpeg', action='store_true', help='Usa apenas o OpenCV, mesmo com o ffmpeg disponível.')
+
+    args = parser.parse_args()
+
+    main(args.video, args.index, args.output, include_all=args.all, use_ffmpeg=not args.no_ffmpeg)
@@ -1,13 +1,19 @@
 import cv2
 import argparse
 import json
+import time
 import mediapipe as mp
 
 from src.posture_analysis import PostureAnalyzer
+from src.multi_template import MultiTemplateAnalyzer
 from src.pose_detector import MediaPipePoseDetector
 from src.kalman_smoother import KalmanPointSmoother
 from src.report import Log
-from config import COLOR_CONFIG
+from src.video_exporter import VideoExporter
+from src.metrics import PipelineMetrics, MetricsServer
+from src.idle_monitor import IdleMonitor
+from src.keypoint_recording import KeypointRecordWriter, KeypointRecordReader
+from config import COLOR_CONFIG, EXPORT_CONFIG, METRICS_CONFIG, MULTI_TEMPLATE_CONFIG, IDLE_CONFIG
 
 def draw_smoothed_landmarks(image, landmarks, detector, landmarks_to_hide=None):
     """Desenha os landmarks suavizados (uma lista de tuplas) na imagem."""
@@ -40,19 +46,40 @@ def draw_smoothed_landmarks(image, landmarks, detector, landmarks_to_hide=None):
         if point:
             cv2.circle(image, point, 5, (0, 0, 255), -1)
 
-def main(exercise_config, video_path=0):
+def get_timestamp_ms(cap, start_time, use_clock):
+    """Retorna o instante do frame atual em milissegundos (relógio para webcam, posição para vídeos)."""
+    if use_clock:
+        return (time.perf_counter() - start_time) * 1000.0
+    return cap.get(cv2.CAP_PROP_POS_MSEC)
+
+def main(exercise_config, video_path=0, export_path=None, metrics_port=None, record_path=None, replay_path=None):
     """
     Função principal para executar a análise de postura em tempo real.
+    Com 'replay_path', os keypoints de uma gravação (.kpr) substituem o vídeo e o detector.
+    Sem 'exercise_config', todos os templates são avaliados e o exercício é reconhecido automaticamente.
     """
     # --- MODO DE DEPURACAO ---
     DEBUG_MODE = True
     
     # --- 1. Inicialização dos Componentes ---
     detector = MediaPipePoseDetector(model_complexity=1, min_detection_confidence=0.4)
-    analyzer = PostureAnalyzer(exercise_config_path=exercise_config, pose_detector=detector)
-    
-    with open(exercise_config, 'r', encoding='utf-8') as f:
-        config_data = json.load(f)
+    auto_mode = exercise_config is None
+
+    if auto_mode:
+        analyzer = MultiTemplateAnalyzer(
+            MULTI_TEMPLATE_CONFIG['templates_dir'],
+            pose_detector=detector,
+            recognition_reps=MULTI_TEMPLATE_CONFIG['recognition_reps'],
+            recognition_margin=MULTI_TEMPLATE_CONFIG['recognition_margin'],
+            recognition_window_frames=MULTI_TEMPLATE_CONFIG['recognition_window_frames'],
+            replay_frames_per_frame=MULTI_TEMPLATE_CONFIG['replay_frames_per_frame']
+        )
+        config_data = {'kalman_filter_params': MULTI_TEMPLATE_CONFIG['kalman_filter_params']}
+    else:
+        analyzer = PostureAnalyzer(exercise_config_path=exercise_config, pose_detector=detector)
+
+        with open(exercise_config, 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
         
     filter_params = config_data.get('kalman_filter_params', {'R': 5, 'Q': 0.1})
     smoother = KalmanPointSmoother(
@@ -61,86 +88,219 @@ def main(exercise_config, video_path=0):
         visibility_threshold=0.65
     )
     
-    reporter = Log(exercise_config=config_data)
+    reporter = None if auto_mode else Log(exercise_config=config_data)
+    tuned_template = None
     landmarks_to_hide = config_data.get('landmarks_to_hide', [])
 
-    cap = cv2.VideoCapture(video_path)
+    # Tipo da fonte, usado pela exportação, pelo modo de espera e pelo índice de repetições
+    if replay_path:
+        source_kind = 'replay'
+    elif isinstance(video_path, int):
+        source_kind = 'live'
+    else:
+        source_kind = 'file'
+
+    if replay_path:
+        cap = KeypointRecordReader(replay_path)
+        pose_source = cap
+    else:
+        cap = cv2.VideoCapture(video_path)
+        pose_source = detector
+
     if not cap.isOpened():
-        print(f"Erro: Não foi possível abrir o vídeo em {video_path}")
+        print(f"Erro: Não foi possível abrir o vídeo em {replay_path or video_path}")
         return
 
+    recorder = None
+    if record_path:
+        frame_size = (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        recorder = KeypointRecordWriter(record_path, frame_size)
+
+    exporter = None
+    if export_path:
+        # Para a webcam, o FPS nominal não reflete a velocidade do loop; a taxa real é medida pelo exportador
+        source_fps = None if source_kind == 'live' else (cap.get(cv2.CAP_PROP_FPS) or EXPORT_CONFIG['default_fps'])
+        exporter = VideoExporter(
+            export_path,
+            fps=source_fps,
+            codec=EXPORT_CONFIG['codec'],
+            resolution=EXPORT_CONFIG['resolution'],
+            frame_step=EXPORT_CONFIG['frame_step'],
+            queue_size=EXPORT_CONFIG['queue_size'],
+            fps_measure_frames=EXPORT_CONFIG['fps_measure_frames'],
+            default_fps=EXPORT_CONFIG['default_fps']
+        )
+
+    metrics = None
+    metrics_server = None
+    if metrics_port is not None:
+        metrics = PipelineMetrics(METRICS_CONFIG['latency_buckets'])
+        metrics_server = MetricsServer(metrics, host=METRICS_CONFIG['host'], port=metrics_port)
+        metrics_server.start()
+
+    # O índice de repetições aponta para um arquivo de vídeo: o próprio vídeo analisado ou, para a webcam
+    # e gravações, o vídeo exportado, numerado pelos frames efetivamente gravados (após decimação e descartes)
+    index_video = video_path if source_kind == 'file' else export_path
+
+    # O modo de espera só vale para câmeras ao vivo: em arquivos e gravações todos os frames
+    # precisam ser analisados, e o tempo de inatividade não corresponde ao tempo real
+    idle_monitor = None
+    if IDLE_CONFIG['enabled'] and source_kind == 'live':
+        idle_monitor = IdleMonitor(
+            idle_after_s=IDLE_CONFIG['idle_after_s'],
+            detect_every_n_frames=IDLE_CONFIG['detect_every_n_frames'],
+            pixel_threshold=IDLE_CONFIG['pixel_threshold'],
+            motion_fraction=IDLE_CONFIG['motion_fraction'],
+            downscale_size=IDLE_CONFIG['downscale_size']
+        )
+
     print(">>> Análise iniciada. Pressione 'q' para sair.")
+    start_time = time.perf_counter()
+    frame_index = -1
+
+    # O bloco 'finally' garante o fechamento do vídeo exportado e da gravação mesmo se o loop falhar;
+    # sem ele, o arquivo de vídeo fica sem o índice final e não pode ser reproduzido
+    try:
+        # --- 2. Loop Principal de Processamento de Vídeo ---
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                print("Fim do vídeo ou erro na captura.")
+                break
 
-    # --- 2. Loop Principal de Processamento de Vídeo ---
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            print("Fim do vídeo ou erro na captura.")
-            break
+            frame_index += 1
+            timestamp_ms = get_timestamp_ms(cap, start_time, use_clock=source_kind == 'live')
+            if source_kind == 'file':
+                rep_frame, rep_ms = frame_index, timestamp_ms
+            elif exporter:
+                # Posição que o frame terá no vídeo exportado; o instante é obtido pelo FPS do arquivo
+                rep_frame, rep_ms = exporter.frames_queued, None
+            else:
+                rep_frame, rep_ms = None, None
         
-        raw_keypoints, pose_landmarks_results = detector.detect_pose(frame)
+            raw_keypoints = []
+            stage_latencies = {}
+            # Frames pulados no modo de espera não passam pelo detector, gravação, filtro nem analisador
+            skipped = idle_monitor is not None and not idle_monitor.should_detect(frame)
+            # A latência do detector é medida após a verificação de movimento do modo de espera
+            t_start = time.perf_counter()
+            if not skipped:
+                raw_keypoints, pose_landmarks_results = pose_source.detect_pose(frame)
+                stage_latencies['detector'] = time.perf_counter() - t_start
+                if idle_monitor:
+                    idle_monitor.update(bool(raw_keypoints))
+
+                if recorder:
+                    recorder.write(raw_keypoints, timestamp_ms)
+            t_detect = time.perf_counter()
         
-        smoothed_keypoints = []
-        calculated_angles = {}
-        if raw_keypoints:
-            smoothed_keypoints = smoother.smooth(raw_keypoints)
-            calculated_angles = analyzer.analyze(smoothed_keypoints, frame.shape[:2], reporter)
-        else:
-            analyzer.analyze([], None, reporter)
+            smoothed_keypoints = []
+            calculated_angles = {}
+            if raw_keypoints:
+                smoothed_keypoints = smoother.smooth(raw_keypoints)
+                t_smooth = time.perf_counter()
+                calculated_angles = analyzer.analyze(smoothed_keypoints, frame.shape[:2], reporter,
+                                                     frame_index=rep_frame, timestamp_ms=rep_ms)
+                stage_latencies['smoother'] = t_smooth - t_detect
+                stage_latencies['analyzer'] = time.perf_counter() - t_smooth
+            elif not skipped:
+                analyzer.analyze([], None, reporter, frame_index=rep_frame, timestamp_ms=rep_ms)
+                stage_latencies['analyzer'] = time.perf_counter() - t_detect
+
+            if metrics:
+                # O contador exportado precisa ser monotônico: no modo automático, 'counter' mostra apenas o
+                # exercício ativo (usado na tela) e voltaria a um valor menor a cada troca de exercício
+                total_reps = analyzer.total_reps if auto_mode else analyzer.counter
+                metrics.record_frame(bool(raw_keypoints), stage_latencies, total_reps, analyzer.feedback_type,
+                                     skipped=skipped)
 
-        # --- 3. Visualização dos Resultados ---
-        if smoothed_keypoints:
-             draw_smoothed_landmarks(frame, smoothed_keypoints, detector, landmarks_to_hide)
+            # --- 3. Visualização dos Resultados ---
+            if auto_mode and analyzer.active is not tuned_template:
+                # Ao reconhecer (ou trocar) o exercício, o filtro passa a usar os parâmetros do template
+                tuned_template = analyzer.active
+                filter_params = analyzer.config.get('kalman_filter_params', MULTI_TEMPLATE_CONFIG['kalman_filter_params'])
+                smoother.set_params(filter_params['R'], filter_params['Q'])
+                landmarks_to_hide = analyzer.config.get('landmarks_to_hide', [])
+
+            if smoothed_keypoints:
+                 draw_smoothed_landmarks(frame, smoothed_keypoints, detector, landmarks_to_hide)
         
-        # --- LÓGICA DO MODO DE DEPURACAO ---
-        if DEBUG_MODE and calculated_angles and smoothed_keypoints:
-            h, w, _ = frame.shape
-            for angle_def in analyzer.angle_definitions:
-                angle_name = angle_def['name']
-                angle_value = calculated_angles.get(angle_name)
+            # --- LÓGICA DO MODO DE DEPURACAO ---
+            if DEBUG_MODE and calculated_angles and smoothed_keypoints:
+                h, w, _ = frame.shape
+                for angle_def in analyzer.angle_definitions:
+                    angle_name = angle_def['name']
+                    angle_value = calculated_angles.get(angle_name)
                 
-                if angle_value is not None:
-                    vertex_index = angle_def['index'][1]
-                    vertex_point = smoothed_keypoints[vertex_index]
-                    text_pos = (int(vertex_point[0] * w) + 10, int(vertex_point[1] * h))
+                    if angle_value is not None:
+                        vertex_index = angle_def['index'][1]
+                        vertex_point = smoothed_keypoints[vertex_index]
+                        text_pos = (int(vertex_point[0] * w) + 10, int(vertex_point[1] * h))
                     
-                    label = angle_name.replace('_', ' ').replace('flexion', '').replace('angle', '')
-                    cv2.putText(frame, f"{label.strip()}: {int(angle_value)}", text_pos, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1, cv2.LINE_AA)
+                        label = angle_name.replace('_', ' ').replace('flexion', '').replace('angle', '')
+                        cv2.putText(frame, f"{label.strip()}: {int(angle_value)}", text_pos, 
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1, cv2.LINE_AA)
 
-        feedback_color = COLOR_CONFIG['feedback_color'].get(analyzer.feedback_type, (255, 255, 255))
+            feedback_color = COLOR_CONFIG['feedback_color'].get(analyzer.feedback_type, (255, 255, 255))
 
-        cv2.putText(frame, f"Exercicio: {analyzer.exercise_name}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-        cv2.putText(frame, f"Reps: {analyzer.counter}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-        cv2.putText(frame, f"Fase: {analyzer.movement_phase}", (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 255), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Feedback:", (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.9, feedback_color, 2, cv2.LINE_AA)
+            cv2.putText(frame, f"Exercicio: {analyzer.exercise_name}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+            cv2.putText(frame, f"Reps: {analyzer.counter}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+            cv2.putText(frame, f"Fase: {analyzer.movement_phase}", (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 255), 2, cv2.LINE_AA)
+            cv2.putText(frame, "Feedback:", (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.9, feedback_color, 2, cv2.LINE_AA)
         
-        y0, dy = 200, 25
-        for i, line in enumerate(analyzer.feedback.split('\n')):
-            y = y0 + i * dy
-            cv2.putText(frame, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, feedback_color, 2, cv2.LINE_AA)
+            y0, dy = 200, 25
+            for i, line in enumerate(analyzer.feedback.split('\n')):
+                y = y0 + i * dy
+                cv2.putText(frame, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, feedback_color, 2, cv2.LINE_AA)
 
-        cv2.imshow('Analise de Postura', frame)
+            if idle_monitor and idle_monitor.idle:
+                cv2.putText(frame, "Modo de espera", (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            cv2.imshow('Analise de Postura', frame)
 
-    # --- 4. Finalização ---
-    print("Salvando resumo da sessão...")
-    reporter.save()
-    
-    cap.release()
-    cv2.destroyAllWindows()
+            if exporter:
+                exporter.submit(frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+        # --- 4. Finalização ---
+        print("Salvando resumo da sessão...")
+        if auto_mode:
+            analyzer.save_reports(video_path=index_video)
+        else:
+            reporter.save(rep_index=analyzer.rep_index, video_path=index_video)
+    finally:
+        if exporter:
+            exporter.close()
+
+        if recorder:
+            recorder.close()
+
+        if metrics_server:
+            metrics_server.stop()
+
+        cap.release()
+        cv2.destroyAllWindows()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Análise de Postura em Exercícios de Calistenia.')
-    parser.add_argument('--exercise', type=str, required=True, help='Caminho para o arquivo de configuração do exercício (JSON).')
+    parser.add_argument('--exercise', type=str, default=None, help='Caminho para o arquivo de configuração do exercício (JSON).')
+    parser.add_argument('--auto', action='store_true', help='Avalia todos os templates e reconhece o exercício automaticamente.')
     parser.add_argument('--video', type=str, default="0", help='Caminho para o arquivo de vídeo ou "0" para usar a webcam.')
+    parser.add_argument('--metrics-port', type=int, default=None, help='Porta do endpoint local de métricas no formato Prometheus (opcional).')
+    parser.add_argument('--record', type=str, default=None, help='Caminho para gravar os keypoints detectados em formato binário (.kpr).')
+    parser.add_argument('--replay', type=str, default=None, help='Caminho de uma gravação de keypoints (.kpr) para usar no lugar do vídeo e do detector.')
+    parser.add_argument('--export', type=str, default=None, help='Caminho para salvar o vídeo anotado (opcional).')
     
     args = parser.parse_args()
+
+    if bool(args.exercise) == args.auto:
+        parser.error('Informe --exercise ou --auto (apenas um deles).')
     
     video_input = 0 if args.video == "0" else args.video
     if isinstance(video_input, str) and video_input.isdigit():
         video_input = int(video_input)
 
-    main(args.exercise, video_input)
\ No newline at end of file
+    main(args.exercise, video_input, export_path=args.export, metrics_port=args.metrics_port,
+         record_path=args.record, replay_path=args.replay)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import time
+import cv2
+
+class IdleMonitor:
+    """
+    Controla o modo de espera quando não há pessoa em frente à câmera.
+
+    Após 'idle_after_s' segundos sem detecção, a inferência completa do detector passa a rodar
+    apenas a cada 'detect_every_n_frames' frames. Nos demais frames o frame reduzido em tons de cinza
+    é comparado a uma referência da cena vazia, capturada ao entrar na espera e renovada a cada
+    execução do detector sem pessoa. Há movimento quando a fração de pixels alterados passa de
+    'motion_fraction': uma pessoa entrando por uma borda altera uma região pequena, que a média
+    do frame inteiro diluiria. Com movimento, o detector roda no mesmo frame e, ao encontrar uma
+    pessoa, a análise volta imediatamente à taxa normal.
+
+    O monitor apenas decide quando chamar o detector: o estado do filtro de Kalman e a contagem
+    de repetições não são alterados durante a espera.
+    """
+    def __init__(self, idle_after_s=10.0, detect_every_n_frames=15, pixel_threshold=25, motion_fraction=0.01,
+                 downscale_size=(64, 36)):
+        """
+        Args:
+            idle_after_s (float): Tempo sem detecção, em segundos, para entrar no modo de espera.
+            detect_every_n_frames (int): No modo de espera, executa o detector uma vez a cada N frames.
+            pixel_threshold (int): Diferença (0-255) em relação à referência a partir da qual um pixel está alterado.
+            motion_fraction (float): Fração de pixels alterados que indica movimento.
+            downscale_size (tuple): (largura, altura) dos frames usados na diferença.
+        """
+        self.idle_after_s = idle_after_s
+        self.detect_every_n_frames = max(1, int(detect_every_n_frames))
+        self.pixel_threshold = pixel_threshold
+        self.motion_fraction = motion_fraction
+        self.downscale_size = tuple(downscale_size)
+
+        self.idle = False
+        self.last_detection_time = time.perf_counter()
+        self._frames_since_detection = 0
+        self._reference_small = None
+        self._last_small = None
+
+    def should_detect(self, frame):
+        """Indica se o detector deve ser executado neste frame."""
+        if not self.idle:
+            return True
+
+        small = cv2.cvtColor(cv2.resize(frame, self.downscale_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self._reference_small is None:
+            self._reference_small = small
+        self._last_small = small
+
+        changed = cv2.absdiff(small, self._reference_small) > self.pixel_threshold
+        motion = changed.mean() > self.motion_fraction
+
+        self._frames_since_detection += 1
+        if motion or self._frames_since_detection >= self.detect_every_n_frames:
+            self._frames_since_detection = 0
+            return True
+        return False
+
+    def update(self, person_detected):
+        """Atualiza o estado após uma execução do detector."""
+        now = time.perf_counter()
+
+        if person_detected:
+            if self.idle:
+                print(">>> Pessoa detectada. Retomando a análise.")
+            self.idle = False
+            self.last_detection_time = now
+            self._reference_small = None
+
+        elif self.idle:
+            # O detector confirmou a cena vazia: o frame atual passa a ser a referência, absorvendo
+            # mudanças lentas de iluminação e movimentos que não trouxeram uma pessoa
+            self._reference_small = self._last_small
+
+        elif now - self.last_detection_time > self.idle_after_s:
+            print(">>> Nenhuma pessoa detectada. Entrando no modo de espera.")
+            self.idle = True
+            self._frames_since_detection = 0
+            # A referência é capturada no primeiro frame da espera
+            self._reference_small = None
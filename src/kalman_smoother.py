@@ -83,6 +83,17 @@ class KalmanPointSmoother:
         }
         self.symmetric_pairs.update({v: k for k, v in self.symmetric_pairs.items()})
 
+    def set_params(self, R, Q):
+        """
+        Altera os ruídos de medição (R) e de processo (Q) mantendo o estado atual dos filtros,
+        sem reiniciar a suavização dos pontos.
+        """
+        self.R = R
+        self.Q = Q
+        for point_filter in self.filters.values():
+            point_filter.kf.R = np.eye(3) * R
+            point_filter.kf.Q = np.eye(9) * Q
+
     def smooth(self, points):
         if not points: return []
         smoothed_points = []
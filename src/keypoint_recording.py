@@ -0,0 +1,307 @@
+import struct
+import zlib
+import cv2
+import numpy as np
+
+# --- FORMATO DO ARQUIVO (.kpr) ---
+# Cabeçalho: magic, versão, nº de landmarks, frames por bloco, largura e altura do vídeo, escala
+# Blocos:    [nº de frames, tamanho comprimido] + zlib(timestamps | presença | deltas xyz | visibilidade)
+# Índice:    offset de cada bloco (uint64) + timestamp de cada frame (float64)
+# Rodapé:    offset do índice, nº de frames, nº de blocos, magic do índice
+# Índice e rodapé só são gravados no close(); se faltarem (processo interrompido), o leitor
+# reconstrói o índice percorrendo os blocos, que são autocontidos.
+MAGIC = b'KPR1'
+INDEX_MAGIC = b'KIDX'
+VERSION = 1
+HEADER_FORMAT = '<4sHHIIId'
+CHUNK_HEADER_FORMAT = '<II'
+TRAILER_FORMAT = '<QII4s'
+
+# Coordenadas normalizadas são quantizadas em passos de 1/4096. Os valores são limitados à metade
+# do intervalo do int16 para que a diferença entre dois frames sempre caiba em um int16.
+QUANT_SCALE = 4096.0
+QUANT_LIMIT = 2**14
+
+class KeypointRecordWriter:
+    """
+    Grava os keypoints retornados por MediaPipePoseDetector.detect_pose em um arquivo binário compacto.
+    Coordenadas são quantizadas e codificadas como deltas entre frames consecutivos, a visibilidade usa
+    8 bits, e os frames são gravados em blocos comprimidos com um índice para acesso direto.
+    """
+    def __init__(self, path, frame_size, num_landmarks=33, chunk_size=256):
+        """
+        Args:
+            path (str): Caminho do arquivo de saída.
+            frame_size (tuple): (largura, altura) do vídeo original, usada na reprodução.
+            num_landmarks (int): Quantidade de landmarks por frame (33 no MediaPipe Pose).
+            chunk_size (int): Quantidade de frames por bloco.
+        """
+        self.num_landmarks = num_landmarks
+        self.chunk_size = chunk_size
+        self.frame_count = 0
+
+        self._file = open(path, 'wb')
+        self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, num_landmarks, chunk_size,
+                                     int(frame_size[0]), int(frame_size[1]), QUANT_SCALE))
+
+        self._chunk_offsets = []
+        self._timestamps = []
+        self._chunk_points = []
+        self._chunk_present = []
+        self._last_points = np.zeros((num_landmarks, 4), dtype=np.float64)
+
+    def write(self, keypoints, timestamp_ms):
+        """
+        Adiciona um frame à gravação.
+
+        Args:
+            keypoints (list): Lista de tuplas (x, y, z, visibilidade); vazia se não houver pessoa.
+            timestamp_ms (float): Instante do frame em milissegundos.
+        """
+        if keypoints:
+            points = np.asarray(keypoints, dtype=np.float64)
+            self._last_points = points
+            self._chunk_present.append(1)
+        else:
+            # Repete as coordenadas anteriores (delta zero) e zera a visibilidade
+            points = self._last_points.copy()
+            points[:, 3] = 0.0
+            self._chunk_present.append(0)
+
+        self._chunk_points.append(points)
+        self._timestamps.append(float(timestamp_ms))
+        self.frame_count += 1
+
+        if len(self._chunk_points) == self.chunk_size:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._chunk_points:
+            return
+
+        points = np.stack(self._chunk_points)
+        n_frames = len(points)
+
+        coords = np.clip(np.rint(points[:, :, :3] * QUANT_SCALE), -QUANT_LIMIT, QUANT_LIMIT - 1).astype(np.int16)
+        # O primeiro frame do bloco é absoluto, permitindo decodificar cada bloco de forma independente
+        deltas = np.diff(coords, axis=0, prepend=np.zeros_like(coords[:1]))
+        visibility = np.clip(np.rint(points[:, :, 3] * 255), 0, 255).astype(np.uint8)
+
+        payload = b''.join((
+            np.asarray(self._timestamps[-n_frames:], dtype='<f8').tobytes(),
+            np.asarray(self._chunk_present, dtype=np.uint8).tobytes(),
+            deltas.astype('<i2').tobytes(),
+            visibility.tobytes()
+        ))
+        compressed = zlib.compress(payload)
+
+        self._chunk_offsets.append(self._file.tell())
+        self._file.write(struct.pack(CHUNK_HEADER_FORMAT, n_frames, len(compressed)))
+        self._file.write(compressed)
+        # Garante que o bloco chegue ao arquivo mesmo que o processo seja interrompido depois
+        self._file.flush()
+
+        self._chunk_points = []
+        self._chunk_present = []
+
+    def close(self):
+        """Grava o último bloco, o índice e o rodapé, e fecha o arquivo."""
+        if self._file.closed:
+            return
+
+        self._flush_chunk()
+
+        index_offset = self._file.tell()
+        self._file.write(np.asarray(self._chunk_offsets, dtype='<u8').tobytes())
+        self._file.write(np.asarray(self._timestamps, dtype='<f8').tobytes())
+        self._file.write(struct.pack(TRAILER_FORMAT, index_offset, self.frame_count,
+                                     len(self._chunk_offsets), INDEX_MAGIC))
+        self._file.close()
+
+class KeypointRecordReader:
+    """
+    Lê uma gravação de keypoints com acesso direto a qualquer frame ou instante.
+
+    Também pode substituir a dupla fonte de vídeo + detector no main.py: implementa isOpened(), read(),
+    get() e release() como um cv2.VideoCapture, e detect_pose() como o MediaPipePoseDetector,
+    retornando os keypoints gravados para o último frame lido.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+
+        header = self._file.read(struct.calcsize(HEADER_FORMAT))
+        # Arquivos menores que o cabeçalho (ex: vazios) também são gravações inválidas
+        if len(header) < struct.calcsize(HEADER_FORMAT):
+            self._file.close()
+            raise ValueError(f"Arquivo de gravação de keypoints inválido: {path}")
+        magic, version, self.num_landmarks, self.chunk_size, width, height, self.scale = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"Arquivo de gravação de keypoints inválido: {path}")
+        self.frame_size = (width, height)
+
+        if not self._read_index():
+            print(f"Aviso: gravação sem índice (interrompida?), reconstruindo a partir dos blocos: {path}")
+            self._rebuild_index()
+
+        self.position = 0
+        self._current_keypoints = []
+        self._cached_chunk = None
+        self._cached_chunk_index = None
+
+    def __len__(self):
+        return self.frame_count
+
+    def _read_index(self):
+        """Lê o índice gravado no final do arquivo. Retorna False se o rodapé não existir."""
+        header_size = struct.calcsize(HEADER_FORMAT)
+        trailer_size = struct.calcsize(TRAILER_FORMAT)
+        file_size = self._file.seek(0, 2)
+        if file_size < header_size + trailer_size:
+            return False
+
+        self._file.seek(-trailer_size, 2)
+        index_offset, frame_count, n_chunks, index_magic = struct.unpack(TRAILER_FORMAT, self._file.read(trailer_size))
+        if index_magic != INDEX_MAGIC or index_offset + 8 * (n_chunks + frame_count) + trailer_size != file_size:
+            return False
+
+        self._file.seek(index_offset)
+        self.frame_count = frame_count
+        self.chunk_offsets = np.frombuffer(self._file.read(8 * n_chunks), dtype='<u8')
+        self.timestamps = np.frombuffer(self._file.read(8 * frame_count), dtype='<f8')
+        return True
+
+    def _rebuild_index(self):
+        """
+        Reconstrói o índice percorrendo os blocos a partir do cabeçalho. A leitura para no primeiro
+        bloco truncado ou inválido; os frames anteriores a ele são recuperados.
+        """
+        chunk_header_size = struct.calcsize(CHUNK_HEADER_FORMAT)
+        file_size = self._file.seek(0, 2)
+        offset = struct.calcsize(HEADER_FORMAT)
+
+        chunk_offsets = []
+        timestamps = []
+        while offset + chunk_header_size <= file_size:
+            self._file.seek(offset)
+            n_frames, compressed_len = struct.unpack(CHUNK_HEADER_FORMAT, self._file.read(chunk_header_size))
+            end = offset + chunk_header_size + compressed_len
+            if not 0 < n_frames <= self.chunk_size or end > file_size:
+                break
+            try:
+                payload = zlib.decompress(self._file.read(compressed_len))
+            except zlib.error:
+                break
+
+            chunk_offsets.append(offset)
+            timestamps.append(np.frombuffer(payload, dtype='<f8', count=n_frames))
+            offset = end
+
+            # Apenas o último bloco pode estar incompleto; o acesso direto depende disso
+            if n_frames < self.chunk_size:
+                break
+
+        self.chunk_offsets = np.asarray(chunk_offsets, dtype='<u8')
+        self.timestamps = np.concatenate(timestamps) if timestamps else np.zeros(0, dtype='<f8')
+        self.frame_count = len(self.timestamps)
+
+    def _load_chunk(self, chunk_index):
+        """Decodifica um bloco inteiro, mantendo em cache o último bloco lido."""
+        if chunk_index == self._cached_chunk_index:
+            return self._cached_chunk
+
+        self._file.seek(int(self.chunk_offsets[chunk_index]))
+        n_frames, compressed_len = struct.unpack(CHUNK_HEADER_FORMAT, self._file.read(struct.calcsize(CHUNK_HEADER_FORMAT)))
+        payload = zlib.decompress(self._file.read(compressed_len))
+
+        L = self.num_landmarks
+        offset = 8 * n_frames  # timestamps já estão no índice
+        present = np.frombuffer(payload, dtype=np.uint8, count=n_frames, offset=offset)
+        offset += n_frames
+        deltas = np.frombuffer(payload, dtype='<i2', count=n_frames * L * 3, offset=offset).reshape(n_frames, L, 3)
+        offset += deltas.nbytes
+        visibility = np.frombuffer(payload, dtype=np.uint8, count=n_frames * L, offset=offset).reshape(n_frames, L)
+
+        points = np.empty((n_frames, L, 4), dtype=np.float64)
+        points[:, :, :3] = np.cumsum(deltas, axis=0, dtype=np.int32) / self.scale
+        points[:, :, 3] = visibility / 255.0
+
+        self._cached_chunk = (present.astype(bool), points)
+        self._cached_chunk_index = chunk_index
+        return self._cached_chunk
+
+    def get_frame(self, frame_index):
+        """
+        Retorna (keypoints, timestamp_ms) de um frame. Os keypoints seguem o formato de detect_pose
+        (lista de tuplas (x, y, z, visibilidade)), vazia quando não havia pessoa no frame.
+        """
+        if not 0 <= frame_index < self.frame_count:
+            raise IndexError(f"Frame {frame_index} fora da gravação ({self.frame_count} frames).")
+
+        chunk_index, row = divmod(frame_index, self.chunk_size)
+        present, points = self._load_chunk(chunk_index)
+
+        keypoints = [tuple(p) for p in points[row].tolist()] if present[row] else []
+        return keypoints, float(self.timestamps[frame_index])
+
+    def frame_at_time(self, timestamp_ms):
+        """Retorna o índice do primeiro frame com timestamp maior ou igual ao informado."""
+        if self.frame_count == 0:
+            return 0
+        return min(int(np.searchsorted(self.timestamps, timestamp_ms)), self.frame_count - 1)
+
+    def seek(self, frame_index):
+        """Posiciona a leitura sequencial (read) no frame indicado."""
+        self.position = max(0, min(frame_index, self.frame_count))
+
+    def seek_time(self, timestamp_ms):
+        """Posiciona a leitura sequencial (read) no frame correspondente ao instante informado."""
+        self.seek(self.frame_at_time(timestamp_ms))
+
+    def iter_keypoints(self):
+        """Percorre a gravação a partir da posição atual, retornando (keypoints, timestamp_ms)."""
+        while self.position < self.frame_count:
+            frame = self.get_frame(self.position)
+            self.position += 1
+            yield frame
+
+    # --- Interface compatível com cv2.VideoCapture + MediaPipePoseDetector ---
+
+    def isOpened(self):
+        return not self._file.closed
+
+    def read(self):
+        """Avança um frame e retorna (True, imagem em branco) para o desenho das anotações."""
+        if self.position >= self.frame_count:
+            return False, None
+
+        self._current_keypoints, _ = self.get_frame(self.position)
+        self.position += 1
+
+        width, height = self.frame_size
+        return True, np.zeros((height, width, 3), dtype=np.uint8)
+
+    def detect_pose(self, image):
+        """Retorna os keypoints gravados do último frame lido, no mesmo formato de detect_pose."""
+        return self._current_keypoints, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return float(self.timestamps[max(self.position - 1, 0)]) if self.frame_count else 0.0
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.frame_size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frame_size[1])
+        if prop == cv2.CAP_PROP_FPS:
+            if self.frame_count < 2:
+                return 0.0
+            duration = self.timestamps[-1] - self.timestamps[0]
+            return (self.frame_count - 1) * 1000.0 / duration if duration > 0 else 0.0
+        return 0.0
+
+    def release(self):
+        self._file.close()
@@ -0,0 +1,160 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class LatencyHistogram:
+    """
+    Histograma de latências (em segundos) com limites fixos de buckets, no formato do Prometheus.
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        # Um contador por bucket mais o bucket '+Inf'
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        """
+        Retorna as linhas de texto do histograma, com os buckets acumulados. O total ('_count') é
+        derivado da mesma cópia dos buckets, para que cada coleta seja consistente mesmo com o loop
+        principal atualizando os valores durante a leitura.
+        """
+        lines = []
+        counts = list(self.counts)
+        total_sum = self.sum
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {total_sum}')
+        lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return lines
+
+class PipelineMetrics:
+    """
+    Coleta métricas de vazão e latência do pipeline detectar -> suavizar -> analisar.
+
+    O loop principal apenas incrementa contadores simples, sem locks; a leitura feita pelo
+    servidor HTTP é uma "foto" desses valores e pode estar, no máximo, um frame atrasada.
+    """
+    STAGES = ('detector', 'smoother', 'analyzer')
+
+    def __init__(self, latency_buckets, fps_smoothing=0.1):
+        self.frames_processed = 0
+        self.frames_no_person = 0
+        self.frames_idle_skipped = 0
+        self.reps = 0
+        self.fps = 0.0
+        self.fps_smoothing = fps_smoothing
+        self.feedback_types = {}
+        self.latency = {stage: LatencyHistogram(latency_buckets) for stage in self.STAGES}
+
+        self._last_frame_time = None
+
+    def record_frame(self, person_detected, stage_latencies, reps, feedback_type, skipped=False):
+        """
+        Registra os dados de um frame processado.
+
+        Args:
+            person_detected (bool): Se o detector encontrou uma pessoa no frame.
+            stage_latencies (dict): Latência em segundos de cada etapa ('detector', 'smoother', 'analyzer').
+            reps (int): Total de repetições contadas na sessão (em todos os exercícios, no modo automático).
+            feedback_type (str): Valor atual de PostureAnalyzer.feedback_type.
+            skipped (bool): Se o detector foi pulado pelo modo de espera; o frame não conta como processado
+                nem como "sem pessoa".
+        """
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            dt = now - self._last_frame_time
+            if dt > 0:
+                # Média móvel exponencial do FPS instantâneo
+                self.fps += self.fps_smoothing * (1.0 / dt - self.fps)
+        self._last_frame_time = now
+
+        if skipped:
+            self.frames_idle_skipped += 1
+        else:
+            self.frames_processed += 1
+            if not person_detected:
+                self.frames_no_person += 1
+
+        for stage, value in stage_latencies.items():
+            self.latency[stage].observe(value)
+
+        self.reps = reps
+        self.feedback_types[feedback_type] = self.feedback_types.get(feedback_type, 0) + 1
+
+    def render(self):
+        """Gera o texto das métricas no formato de exposição do Prometheus."""
+        lines = [
+            '# HELP posture_frames_processed_total Frames processados pelo pipeline.',
+            '# TYPE posture_frames_processed_total counter',
+            f'posture_frames_processed_total {self.frames_processed}',
+            '# HELP posture_frames_no_person_total Frames em que o detector rodou e nao encontrou pessoa.',
+            '# TYPE posture_frames_no_person_total counter',
+            f'posture_frames_no_person_total {self.frames_no_person}',
+            '# HELP posture_frames_idle_skipped_total Frames sem deteccao por causa do modo de espera.',
+            '# TYPE posture_frames_idle_skipped_total counter',
+            f'posture_frames_idle_skipped_total {self.frames_idle_skipped}',
+            '# HELP posture_fps Taxa atual de frames lidos por segundo, incluindo os pulados no modo de espera.',
+            '# TYPE posture_fps gauge',
+            f'posture_fps {self.fps:.3f}',
+            '# HELP posture_reps_total Repeticoes contadas na sessao.',
+            '# TYPE posture_reps_total counter',
+            f'posture_reps_total {self.reps}',
+            '# HELP posture_feedback_frames_total Frames por tipo de feedback.',
+            '# TYPE posture_feedback_frames_total counter',
+        ]
+        # dict.copy() é atômico no CPython, evitando erro caso um novo tipo surja durante a leitura
+        for feedback_type, count in sorted(self.feedback_types.copy().items()):
+            lines.append(f'posture_feedback_frames_total{{type="{feedback_type}"}} {count}')
+
+        lines.append('# HELP posture_stage_latency_seconds Latencia de cada etapa do pipeline.')
+        lines.append('# TYPE posture_stage_latency_seconds histogram')
+        for stage in self.STAGES:
+            lines.extend(self.latency[stage].render('posture_stage_latency_seconds', f'stage="{stage}"'))
+
+        return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """
+    Servidor HTTP local, em thread própria, que expõe as métricas em '/metrics'.
+    """
+    def __init__(self, metrics, host='127.0.0.1', port=9100):
+        self.metrics = metrics
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] != '/metrics':
+                    handler.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                # Evita poluir o terminal com uma linha a cada coleta
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, name='MetricsServer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f">>> Métricas disponíveis em http://{self.address[0]}:{self.address[1]}/metrics")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
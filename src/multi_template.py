@@ -0,0 +1,268 @@
+import glob
+import os
+from collections import deque
+import numpy as np
+
+from src.posture_analysis import PostureAnalyzer
+from src.report import Log
+
+class MultiTemplateAnalyzer:
+    """
+    Avalia todos os templates de exercício de uma pasta ao mesmo tempo e reconhece qual exercício
+    está sendo executado a partir do movimento.
+
+    Os ângulos de todos os templates são unidos em uma única tabela sem repetições e calculados em
+    uma só operação vetorizada por frame. Uma máquina de estados up/down, também vetorizada, acompanha
+    o ângulo principal de cada template e conta os ciclos completos em uma janela recente de frames.
+    Um template é escolhido quando acumula ciclos suficientes na janela com vantagem sobre o segundo
+    colocado; apenas o seu PostureAnalyzer avalia postura e conta repetições. O reconhecimento continua
+    rodando durante toda a sessão, permitindo trocar de exercício.
+
+    Os frames guardados antes do reconhecimento são reprocessados pelo template escolhido aos poucos,
+    no máximo 'replay_frames_per_frame' por chamada, para que o custo por frame continue limitado.
+    """
+    def __init__(self, templates_dir, pose_detector, recognition_reps=3, recognition_margin=2,
+                 recognition_window_frames=450, replay_frames_per_frame=15):
+        """
+        Args:
+            templates_dir (str): Pasta com os arquivos .json dos exercícios.
+            pose_detector: Objeto com get_landmark_index (ex: MediaPipePoseDetector).
+            recognition_reps (int): Ciclos do ângulo principal, dentro da janela, exigidos para escolher um template.
+            recognition_margin (int): Vantagem mínima, em ciclos, sobre o segundo colocado (ou sobre o template ativo).
+            recognition_window_frames (int): Tamanho da janela, em frames, usada na contagem de ciclos. Os frames
+                da janela também são reprocessados pelo template escolhido, para que as repetições que levaram
+                ao reconhecimento sejam avaliadas. Numa troca, apenas os frames desde o último ciclo completo do
+                template antigo (quando o novo passou à frente) são reprocessados: até ali, as repetições já foram
+                contadas pelo template antigo.
+            replay_frames_per_frame (int): Frames guardados reprocessados a cada chamada de analyze.
+        """
+        template_paths = sorted(glob.glob(os.path.join(templates_dir, '*.json')))
+        if not template_paths:
+            raise ValueError(f"Nenhum template de exercício encontrado em '{templates_dir}'")
+
+        self.analyzers = [PostureAnalyzer(exercise_config_path=path, pose_detector=pose_detector)
+                          for path in template_paths]
+        self.recognition_reps = recognition_reps
+        self.recognition_margin = recognition_margin
+        self.replay_frames_per_frame = max(2, int(replay_frames_per_frame))
+
+        # --- TABELA ÚNICA DE ÂNGULOS ---
+        # Ângulos com os mesmos três landmarks são calculados uma única vez para todos os templates
+        triplet_columns = {}
+        self.template_columns = []
+        for analyzer in self.analyzers:
+            columns = {}
+            for angle_def in analyzer.angle_definitions:
+                triplet = tuple(angle_def['index'])
+                columns[angle_def['name']] = triplet_columns.setdefault(triplet, len(triplet_columns))
+            self.template_columns.append(columns)
+        self.triplets = np.array(list(triplet_columns), dtype=np.intp)
+
+        # Coluna do ângulo principal de cada template e do seu equivalente no lado oposto do corpo
+        main_columns, opposite_columns = [], []
+        for analyzer, columns in zip(self.analyzers, self.template_columns):
+            main_name = analyzer.config['main_angle']
+            opposite_name = main_name
+            if 'right_' in main_name: opposite_name = main_name.replace('right_', 'left_')
+            elif 'left_' in main_name: opposite_name = main_name.replace('left_', 'right_')
+            main_columns.append(columns[main_name])
+            opposite_columns.append(columns.get(opposite_name, columns[main_name]))
+        self.main_columns = np.array(main_columns, dtype=np.intp)
+        self.opposite_columns = np.array(opposite_columns, dtype=np.intp)
+
+        self.down_thresholds = np.array([a.rules['state_change']['down_angle'] for a in self.analyzers], dtype=np.float64)
+        self.up_thresholds = np.array([a.rules['state_change']['up_angle'] for a in self.analyzers], dtype=np.float64)
+
+        # --- RECONHECIMENTO ---
+        self.is_down = np.zeros(len(self.analyzers), dtype=bool)
+        # Janela circular com os ciclos completados em cada frame; 'recent_cycles' é a soma da janela
+        self.cycle_window = np.zeros((recognition_window_frames, len(self.analyzers)), dtype=np.int64)
+        self.recent_cycles = np.zeros(len(self.analyzers), dtype=np.int64)
+        self._window_pos = 0
+        self.frame_buffer = deque(maxlen=recognition_window_frames)
+        # Total de frames guardados e a posição, nessa contagem, do último ciclo completo de cada template
+        self._buffered_frames = 0
+        self._last_cycle_frame = np.zeros(len(self.analyzers), dtype=np.int64)
+        # Frames aguardando o reprocessamento pelo template ativo, em ordem
+        self.replay_queue = deque()
+
+        self.active = None
+        self.active_index = None
+        self.reporters = {}
+
+    # --- Atributos do analisador ativo, usados pelo main.py para a visualização ---
+
+    @property
+    def exercise_name(self):
+        return self.active.exercise_name if self.active else "Identificando..."
+
+    @property
+    def counter(self):
+        return self.active.counter if self.active else 0
+
+    @property
+    def total_reps(self):
+        """Repetições de todos os exercícios da sessão; ao contrário de 'counter', nunca diminui numa troca."""
+        return sum(analyzer.counter for analyzer in self.analyzers)
+
+    @property
+    def movement_phase(self):
+        return self.active.movement_phase if self.active else "INDETERMINADO"
+
+    @property
+    def feedback(self):
+        return self.active.feedback if self.active else "Identificando o exercicio..."
+
+    @property
+    def feedback_type(self):
+        return self.active.feedback_type if self.active else "INFO"
+
+    @property
+    def angle_definitions(self):
+        return self.active.angle_definitions if self.active else []
+
+    @property
+    def config(self):
+        return self.active.config if self.active else {}
+
+    def measure_all(self, keypoints):
+        """
+        Calcula, em uma única operação vetorizada, todos os ângulos da tabela compartilhada e a
+        visibilidade média dos pontos de cada ângulo.
+        """
+        points = np.asarray(keypoints, dtype=np.float64)
+        p1 = points[self.triplets[:, 0], :3]
+        p2 = points[self.triplets[:, 1], :3]
+        p3 = points[self.triplets[:, 2], :3]
+
+        v1 = p1 - p2
+        v2 = p3 - p2
+        norms = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+        dot_products = np.einsum('ij,ij->i', v1, v2)
+
+        # Mesmo comportamento de calculate_angle_3d: 0 graus quando algum vetor é nulo
+        cosines = np.divide(dot_products, norms, out=np.ones_like(dot_products), where=norms > 0)
+        angles = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+        angles[norms == 0] = 0.0
+
+        visibilities = points[self.triplets, 3].mean(axis=1)
+        return angles, visibilities
+
+    def _template_measurements(self, template_index, angles, visibilities):
+        """Converte os vetores compartilhados nos dicionários (ângulos, visibilidades) de um template."""
+        columns = self.template_columns[template_index]
+        return ({name: float(angles[col]) for name, col in columns.items()},
+                {name: float(visibilities[col]) for name, col in columns.items()})
+
+    def _update_recognition(self, angles, visibilities):
+        """Atualiza a máquina de estados up/down de todos os templates de uma só vez."""
+        use_opposite = visibilities[self.opposite_columns] > visibilities[self.main_columns]
+        main_angles = np.where(use_opposite, angles[self.opposite_columns], angles[self.main_columns])
+
+        going_down = ~self.is_down & (main_angles < self.down_thresholds)
+        coming_up = self.is_down & (main_angles > self.up_thresholds)
+        self.is_down = (self.is_down | going_down) & ~coming_up
+
+        self.recent_cycles += coming_up - self.cycle_window[self._window_pos]
+        self.cycle_window[self._window_pos] = coming_up
+        self._window_pos = (self._window_pos + 1) % len(self.cycle_window)
+        self._last_cycle_frame[coming_up] = self._buffered_frames
+
+    def _recognized_template(self):
+        """
+        Retorna o índice do template com evidência suficiente na janela recente, ou None.
+        Movimentos isolados (ex: entrar no quadro, deitar para a prancha) completam no máximo um ou
+        dois ciclos de outros templates e não bastam para vencer a margem exigida.
+        """
+        if len(self.recent_cycles) == 1:
+            return 0 if self.recent_cycles[0] >= self.recognition_reps else None
+
+        runner_up, best = np.argsort(self.recent_cycles, kind='stable')[-2:]
+        if self.recent_cycles[best] < self.recognition_reps:
+            return None
+        if self.recent_cycles[best] - self.recent_cycles[runner_up] < self.recognition_margin:
+            return None
+        return int(best)
+
+    def _activate(self, template_index):
+        """Escolhe o template e agenda o reprocessamento dos frames guardados."""
+        previous, previous_index = self.active, self.active_index
+        self.active_index = template_index
+        self.active = self.analyzers[template_index]
+        if template_index not in self.reporters:
+            self.reporters[template_index] = Log(exercise_config=self.active.config)
+
+        if previous is None:
+            print(f">>> Exercício reconhecido: {self.active.exercise_name}")
+            frames = list(self.frame_buffer)
+        else:
+            print(f">>> Troca de exercício: {previous.exercise_name} -> {self.active.exercise_name}")
+            # Até o último ciclo do template antigo, as repetições já estão no relatório dele; dali em diante
+            # apenas o novo template completou ciclos
+            lead_frames = min(self._buffered_frames - int(self._last_cycle_frame[previous_index]),
+                              len(self.frame_buffer))
+            frames = list(self.frame_buffer)[len(self.frame_buffer) - lead_frames:]
+
+        # Frames do template anterior ainda não reprocessados são descartados junto com a fila
+        self.replay_queue = deque(frames)
+        self.frame_buffer.clear()
+
+    def _analyze_buffered(self, item):
+        """Avalia um frame guardado com o template ativo."""
+        keypoints, image_shape, angles, visibilities, frame_index, timestamp_ms = item
+        reporter = self.reporters[self.active_index]
+        if not keypoints:
+            return self.active.analyze([], None, reporter, frame_index=frame_index, timestamp_ms=timestamp_ms)
+        measurements = self._template_measurements(self.active_index, angles, visibilities)
+        return self.active.analyze(keypoints, image_shape, reporter, measurements=measurements,
+                                   frame_index=frame_index, timestamp_ms=timestamp_ms)
+
+    def _drain_replay(self):
+        """
+        Reprocessa até 'replay_frames_per_frame' frames da fila. O frame atual entra no fim da fila,
+        mantendo a ordem; enquanto a fila não se esvazia, não há ângulos do frame atual a retornar.
+        """
+        last_angles = {}
+        for _ in range(min(self.replay_frames_per_frame, len(self.replay_queue))):
+            last_angles = self._analyze_buffered(self.replay_queue.popleft())
+        return {} if self.replay_queue else last_angles
+
+    def analyze(self, keypoints, image_shape, reporter=None, frame_index=None, timestamp_ms=None):
+        """
+        Analisa um frame com todos os templates. Mantém a mesma interface do PostureAnalyzer;
+        os relatórios são gerados por template, e o argumento 'reporter' é ignorado.
+        """
+        if not keypoints:
+            item = ([], None, None, None, frame_index, timestamp_ms)
+        else:
+            angles, visibilities = self.measure_all(keypoints)
+            item = (keypoints, image_shape, angles, visibilities, frame_index, timestamp_ms)
+        self.frame_buffer.append(item)
+        self._buffered_frames += 1
+
+        if keypoints:
+            self._update_recognition(angles, visibilities)
+            template_index = self._recognized_template()
+            if template_index is not None and template_index != self.active_index:
+                # O frame atual já está entre os frames guardados e entra na fila de reprocessamento
+                self._activate(template_index)
+                return self._drain_replay()
+
+        if not self.active:
+            return {}
+
+        if self.replay_queue:
+            self.replay_queue.append(item)
+            return self._drain_replay()
+        return self._analyze_buffered(item)
+
+    def save_reports(self, video_path=None):
+        """Salva o relatório de cada exercício reconhecido na sessão (ver Log.save)."""
+        if not self.reporters:
+            print("Nenhum exercício foi reconhecido para gerar o relatório.")
+            return
+        # Frames ainda na fila de reprocessamento quando a sessão termina
+        while self.replay_queue:
+            self._analyze_buffered(self.replay_queue.popleft())
+        for template_index, reporter in self.reporters.items():
+            reporter.save(rep_index=self.analyzers[template_index].rep_index, video_path=video_path)
@@ -0,0 +1,188 @@
+import copy
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import mediapipe as mp
+
+from src.posture_analysis import PostureAnalyzer
+from src.kalman_smoother import KalmanPointSmoother
+from src.keypoint_recording import KeypointRecordReader
+
+# Parâmetros aceitos na varredura; os que não forem variados usam o valor do template (ou 0.65 para a visibilidade)
+SWEEP_PARAMETERS = ('R', 'Q', 'visibility_threshold', 'up_angle', 'down_angle')
+
+# Sessões carregadas uma única vez por processo de trabalho, agrupadas pelo caminho do template
+_SESSIONS = {}
+
+class LandmarkIndexMap:
+    """
+    Substituto leve do MediaPipePoseDetector para o PostureAnalyzer: fornece apenas get_landmark_index,
+    sem carregar o modelo de detecção.
+    """
+    def __init__(self):
+        self.keypoints_map = {landmark.name: landmark.value for landmark in mp.solutions.pose.PoseLandmark}
+
+    def get_landmark_index(self, landmark_name):
+        return self.keypoints_map.get(landmark_name.upper())
+
+class RepCollector:
+    """Substituto do Log que apenas guarda o resultado de cada repetição."""
+    def __init__(self):
+        self.reps = {}
+
+    def save_rep(self, rep_num, rep_ok, rep_error):
+        self.reps[rep_num] = rep_ok
+
+def load_manifest(manifest_path):
+    """
+    Lê o arquivo JSON com as sessões gravadas e seus rótulos. Formato esperado:
+
+        {"sessions": [{"recording": "gravacoes/s1.kpr", "exercise": "exercise_templates/squat.json",
+                       "reps": 10, "error_reps": [3, 7]}]}
+
+    'error_reps' lista os números das repetições executadas com erro de postura. As sessões podem usar
+    templates diferentes; cada template é avaliado e classificado separadamente (ver run_sweep).
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    sessions = manifest['sessions']
+    for session in sessions:
+        for key in ('recording', 'exercise', 'reps'):
+            if key not in session:
+                raise ValueError(f"Sessão sem o campo obrigatório '{key}': {session}")
+        session.setdefault('error_reps', [])
+    return sessions
+
+def build_configurations(grid, random_samples=None, seed=None):
+    """
+    Gera as combinações de parâmetros da grade. Com 'random_samples', sorteia essa quantidade de
+    combinações distintas (busca aleatória) em vez de avaliar a grade completa.
+    Combinações com down_angle >= up_angle são descartadas.
+    """
+    for name in grid:
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Parâmetro de varredura desconhecido: '{name}'")
+
+    names = list(grid)
+    configurations = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    configurations = [c for c in configurations
+                      if not ('up_angle' in c and 'down_angle' in c and c['down_angle'] >= c['up_angle'])]
+
+    if random_samples is not None and random_samples < len(configurations):
+        configurations = random.Random(seed).sample(configurations, random_samples)
+    return configurations
+
+def _init_worker(sessions):
+    """Carrega as gravações uma única vez por processo; os keypoints são reutilizados por todas as configurações."""
+    global _SESSIONS
+    _SESSIONS = {}
+    for session in sessions:
+        reader = KeypointRecordReader(session['recording'])
+        frames = [keypoints for keypoints, _ in reader.iter_keypoints()]
+        width, height = reader.frame_size
+        reader.release()
+
+        with open(session['exercise'], 'r', encoding='utf-8') as f:
+            exercise_config = json.load(f)
+
+        _SESSIONS.setdefault(session['exercise'], []).append({
+            'frames': frames,
+            'image_shape': (height, width),
+            'exercise_path': session['exercise'],
+            'exercise_config': exercise_config,
+            'reps': session['reps'],
+            'error_reps': set(session['error_reps'])
+        })
+
+def _run_session(session, params, landmark_map):
+    """Executa suavização + análise de uma sessão gravada e retorna as repetições contadas."""
+    exercise_config = session['exercise_config']
+    filter_params = exercise_config.get('kalman_filter_params', {'R': 5, 'Q': 0.1})
+
+    smoother = KalmanPointSmoother(
+        R=params.get('R', filter_params['R']),
+        Q=params.get('Q', filter_params['Q']),
+        visibility_threshold=params.get('visibility_threshold', 0.65)
+    )
+    analyzer = PostureAnalyzer(exercise_config_path=session['exercise_path'], pose_detector=landmark_map)
+
+    rules = copy.deepcopy(analyzer.rules)
+    for key in ('up_angle', 'down_angle'):
+        if key in params:
+            rules['state_change'][key] = params[key]
+    analyzer.rules = rules
+
+    collector = RepCollector()
+    for raw_keypoints in session['frames']:
+        if raw_keypoints:
+            analyzer.analyze(smoother.smooth(raw_keypoints), session['image_shape'], collector)
+        else:
+            analyzer.analyze([], None, collector)
+    return collector.reps
+
+def _evaluate(task):
+    """Avalia uma configuração nas sessões de um template e calcula as métricas de acerto."""
+    exercise_path, params = task
+    start = time.perf_counter()
+    landmark_map = LandmarkIndexMap()
+    sessions = _SESSIONS[exercise_path]
+
+    rep_scores = []
+    exact = 0
+    true_pos = false_pos = false_neg = 0
+
+    for session in sessions:
+        reps = _run_session(session, params, landmark_map)
+        expected = session['reps']
+        counted = len(reps)
+
+        rep_scores.append(max(0.0, 1.0 - abs(counted - expected) / max(expected, 1)))
+        exact += counted == expected
+
+        flagged = {rep for rep, ok in reps.items() if not ok}
+        true_pos += len(flagged & session['error_reps'])
+        false_pos += len(flagged - session['error_reps'])
+        false_neg += len(session['error_reps'] - flagged)
+
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    return {
+        'exercise': exercise_path,
+        'params': params,
+        'rep_accuracy': sum(rep_scores) / len(rep_scores) if rep_scores else 0.0,
+        'rep_exact': exact / len(sessions) if sessions else 0.0,
+        'error_precision': precision,
+        'error_recall': recall,
+        'error_f1': f1,
+        'runtime_s': time.perf_counter() - start
+    }
+
+def run_sweep(sessions, configurations, workers=None):
+    """
+    Avalia as configurações em paralelo, separadamente para cada template presente nas sessões:
+    limiares e parâmetros do filtro de um exercício não servem para outro.
+
+    Os erros são comparados pelo número da repetição; se a contagem divergir do rótulo,
+    as repetições seguintes podem ficar desalinhadas, o que também penaliza a configuração.
+
+    Returns:
+        dict: Caminho do template -> resultados das configurações, ordenados pela precisão na
+        contagem de repetições e, em seguida, pelo F1 da detecção de erros.
+    """
+    exercise_paths = list(dict.fromkeys(session['exercise'] for session in sessions))
+    tasks = [(path, params) for path in exercise_paths for params in configurations]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(sessions,)) as executor:
+        results = list(executor.map(_evaluate, tasks))
+
+    ranking = {path: [] for path in exercise_paths}
+    for result in results:
+        ranking[result['exercise']].append(result)
+    for template_results in ranking.values():
+        template_results.sort(key=lambda r: (-r['rep_accuracy'], -r['error_f1'], r['runtime_s']))
+    return ranking
@@ -32,6 +32,11 @@ class PostureAnalyzer:
         self.rep_quality = True
         self.actual_rep_errors = set()
 
+        # --- ÍNDICE DE REPETIÇÕES (posição de cada rep no vídeo) ---
+        self.current_frame = (None, None)   # (índice do frame, timestamp em ms)
+        self.rep_start = (None, None)
+        self.rep_index = []
+
         # --- LÓGICA DE FEEDBACK E ESTADO ---
         self.feedback = "Inicie o exercicio."
         self.feedback_type = "INFO"
@@ -77,13 +82,8 @@ class PostureAnalyzer:
         
         return "TRANSICAO"
 
-    def analyze(self, keypoints, image_shape, reporter):
-        if not keypoints:
-            self.feedback = "Nenhuma pessoa detectada."
-            self.feedback_type = "ERRO_CRITICO"
-            self.movement_phase = "INDETERMINADO"
-            return {}
-
+    def measure(self, keypoints):
+        """Calcula cada ângulo definido no template e a visibilidade média dos seus pontos."""
         angles = {}
         visibilities = {}
 
@@ -94,6 +94,24 @@ class PostureAnalyzer:
             angles[name] = calculate_angle_3d(keypoints, p1_idx, p2_idx, p3_idx)
             visibilities[name] = self._get_keypoint_visibility(keypoints, index)
 
+        return angles, visibilities
+
+    def analyze(self, keypoints, image_shape, reporter, measurements=None, frame_index=None, timestamp_ms=None):
+        """
+        Analisa um frame. 'measurements' permite informar (ângulos, visibilidades) já calculados
+        externamente (ex: MultiTemplateAnalyzer), evitando recalculá-los. 'frame_index' e 'timestamp_ms'
+        identificam o frame no vídeo e são usados para registrar o início e o fim de cada repetição.
+        """
+        self.current_frame = (frame_index, timestamp_ms)
+
+        if not keypoints:
+            self.feedback = "Nenhuma pessoa detectada."
+            self.feedback_type = "ERRO_CRITICO"
+            self.movement_phase = "INDETERMINADO"
+            return {}
+
+        angles, visibilities = measurements if measurements is not None else self.measure(keypoints)
+
         if self.exercise_name == "Agachamento":
             self.movement_phase = self._analyze_squat_phase(angles, visibilities)
 
@@ -205,9 +223,19 @@ class PostureAnalyzer:
             self.rep_state = 'down'
             self.rep_quality = True
             self.actual_rep_errors.clear()
+            self.rep_start = self.current_frame
             
         elif self.rep_state == 'down' and main_angle_value > up_threshold:
             self.counter += 1
+            self.rep_index.append({
+                'rep': self.counter,
+                'start_frame': self.rep_start[0],
+                'end_frame': self.current_frame[0],
+                'start_ms': self.rep_start[1],
+                'end_ms': self.current_frame[1],
+                'ok': self.rep_quality,
+                'errors': sorted(self.actual_rep_errors)
+            })
             reporter.save_rep(self.counter, self.rep_quality, self.actual_rep_errors)
             self.rep_state = 'up'
             self.rep_complete_feedback_end_time = time.time() + 2
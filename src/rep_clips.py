@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import subprocess
+import cv2
+
+def load_rep_index(index_path):
+    """
+    Lê o índice de repetições (indice_reps_*.json) gerado pelo relatório da sessão.
+
+    Returns:
+        tuple: (vídeo ao qual as posições se referem, lista de repetições).
+    """
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return index.get('video'), index['reps']
+
+def select_reps(reps, only_flagged=True):
+    """Retorna as repetições a extrair: por padrão, apenas as que tiveram erro de postura."""
+    return [rep for rep in reps if not (only_flagged and rep['ok'])]
+
+def _rep_interval_s(rep, fps, padding_s):
+    """
+    Calcula o intervalo (início, fim) em segundos da rep, com margem antes e depois. Sem os instantes
+    (sessões da webcam, indexadas pelos frames do vídeo exportado), usa o FPS do arquivo.
+    """
+    if rep.get('start_ms') is not None and rep.get('end_ms') is not None:
+        start_s, end_s = rep['start_ms'] / 1000.0, rep['end_ms'] / 1000.0
+    else:
+        start_s, end_s = rep['start_frame'] / fps, rep['end_frame'] / fps
+    return max(0.0, start_s - padding_s), end_s + padding_s
+
+def extract_clip_ffmpeg(video_path, start_s, end_s, output_path):
+    """
+    Extrai o trecho com o ffmpeg sem decodificar o vídeo: a busca antes de '-i' salta direto para o
+    keyframe anterior ao início, e '-c copy' copia os pacotes sem recodificar. O clipe pode começar
+    alguns frames antes do pedido, no keyframe mais próximo.
+    """
+    command = [
+        'ffmpeg', '-loglevel', 'error', '-y',
+        '-ss', f"{start_s:.3f}", '-i', video_path,
+        '-t', f"{end_s - start_s:.3f}",
+        '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+        output_path
+    ]
+    return subprocess.run(command).returncode == 0
+
+def extract_clip_opencv(cap, start_frame, end_frame, output_path, fps, codec):
+    """
+    Alternativa sem ffmpeg: posiciona a captura no frame inicial (o OpenCV salta para o keyframe anterior
+    e decodifica apenas até ele) e recodifica somente os frames da repetição.
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    writer = None
+    for _ in range(start_frame, end_frame + 1):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if writer is None:
+            h, w = frame.shape[:2]
+            writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*codec), fps, (w, h))
+        writer.write(frame)
+
+    if writer is None:
+        return False
+    writer.release()
+    return True
+
+def extract_rep_clips(video_path, reps, output_dir, padding_s=0.5, codec='mp4v', use_ffmpeg=True):
+    """
+    Gera um clipe por repetição em 'output_dir'. Usa o ffmpeg (cópia de pacotes, sem decodificação)
+    quando disponível e, caso contrário, o OpenCV.
+
+    Returns:
+        list: Caminhos dos clipes gerados.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Não foi possível abrir o vídeo em {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    use_ffmpeg = use_ffmpeg and shutil.which('ffmpeg') is not None
+    extension = os.path.splitext(video_path)[1] if use_ffmpeg else '.mp4'
+
+    clips = []
+    for rep in reps:
+        output_path = os.path.join(output_dir, f"rep_{rep['rep']:03d}{extension}")
+        start_s, end_s = _rep_interval_s(rep, fps, padding_s)
+
+        if use_ffmpeg:
+            ok = extract_clip_ffmpeg(video_path, start_s, end_s, output_path)
+        else:
+            ok = extract_clip_opencv(cap, round(start_s * fps), round(end_s * fps), output_path, fps, codec)
+
+        if ok:
+            clips.append(output_path)
+        else:
+            print(f"Erro ao extrair o clipe da repetição {rep['rep']}.")
+
+    cap.release()
+    return clips
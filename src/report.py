@@ -1,4 +1,5 @@
 import os
+import json
 from datetime import datetime
 from config import LOG_CONFIG
 from collections import Counter
@@ -25,6 +26,7 @@ class Log:
 
         timestamp_file = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.log_file = os.path.join(self.dir_logs, f"resumo_{self.exercise_name}_{timestamp_file}.txt")
+        self.index_file = os.path.join(self.dir_logs, f"indice_reps_{self.exercise_name}_{timestamp_file}.json")
         
         self._make_dir_log()
     
@@ -53,8 +55,16 @@ class Log:
                 self.stats['errors'][error]['count'] += 1
                 self.stats['errors'][error]['reps'].append(rep_num)
     
-    def save(self):
-        """Salva o resumo estatístico da sessão em um arquivo de texto legível."""
+    def save(self, rep_index=None, video_path=None):
+        """
+        Salva o resumo estatístico da sessão em um arquivo de texto legível.
+
+        Args:
+            rep_index (list): Índice de repetições do PostureAnalyzer (PostureAnalyzer.rep_index),
+                salvo em JSON ao lado do resumo.
+            video_path (str | None): Vídeo ao qual as posições do índice se referem. Sem ele (ex: webcam
+                sem --export) não há onde localizar as repetições, e o índice não é salvo.
+        """
         if self.stats['total_reps'] == 0:
             print("Nenhuma repetição foi completada para gerar o relatório.")
             return
@@ -109,4 +119,11 @@ class Log:
 
         # Escreve o conteúdo no arquivo .txt
         with open(self.log_file, 'w', encoding='utf-8') as f:
-            f.write("\n".join(report_content))
\ No newline at end of file
+            f.write("\n".join(report_content))
+
+        # Índice com a posição de cada repetição no vídeo, usado pelo extract_clips.py
+        if rep_index and video_path:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump({'exercise': self.exercise_name, 'video': video_path, 'reps': rep_index}, f, indent=2, ensure_ascii=False)
+        elif rep_index:
+            print("Índice de repetições não salvo: a sessão não gerou um arquivo de vídeo (use --export com a webcam).")
\ No newline at end of file
@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+import cv2
+
+class VideoExporter:
+    """
+    Grava em arquivo os frames anotados (esqueleto, ângulos e feedback) em uma thread separada.
+    O loop principal apenas entrega o frame a uma fila limitada; a codificação fica toda na thread
+    de escrita, evitando adicionar latência à análise em tempo real.
+    """
+    def __init__(self, output_path, fps, codec='mp4v', resolution=None, frame_step=1, queue_size=64,
+                 fps_measure_frames=30, default_fps=30.0):
+        """
+        Args:
+            output_path (str): Caminho do arquivo de vídeo de saída.
+            fps (float | None): Taxa de quadros da fonte de vídeo. None mede a taxa real de entrega dos
+                frames (fontes ao vivo, onde o FPS nominal da câmera não reflete a velocidade da análise).
+            codec (str): Código FourCC do codec (ex: 'mp4v', 'XVID', 'MJPG').
+            resolution (tuple | None): (largura, altura) de saída. None mantém a resolução original.
+            frame_step (int): Exporta apenas um a cada 'frame_step' frames (decimação).
+            queue_size (int): Tamanho máximo da fila entre o loop principal e a thread de escrita.
+            fps_measure_frames (int): Frames usados para medir a taxa quando 'fps' é None.
+            default_fps (float): Taxa usada quando não há frames suficientes para a medição.
+        """
+        self.output_path = output_path
+        self.frame_step = max(1, int(frame_step))
+        self.fps = fps / self.frame_step if fps else None
+        self.fps_measure_frames = max(2, int(fps_measure_frames))
+        self.default_fps = default_fps
+        self.fourcc = cv2.VideoWriter_fourcc(*codec)
+        self.resolution = tuple(resolution) if resolution else None
+
+        self.frames_received = 0
+        # Frames entregues à fila; também é a posição do próximo frame aceito no vídeo de saída
+        self.frames_queued = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='VideoExporter', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """
+        Entrega um frame anotado para exportação sem bloquear o chamador.
+        Se a fila estiver cheia, o frame é descartado e contabilizado em 'frames_dropped'.
+        O frame não deve ser modificado após a entrega.
+        """
+        if self._closed:
+            return
+
+        self.frames_received += 1
+        if (self.frames_received - 1) % self.frame_step != 0:
+            return
+
+        try:
+            self._queue.put_nowait((frame, time.perf_counter()))
+        except queue.Full:
+            self.frames_dropped += 1
+            return
+        self.frames_queued += 1
+
+    def _open_writer(self, frame):
+        if self.resolution is None:
+            h, w = frame.shape[:2]
+            self.resolution = (w, h)
+
+        self._writer = cv2.VideoWriter(self.output_path, self.fourcc, self.fps, self.resolution)
+        if not self._writer.isOpened():
+            print(f"Erro: Não foi possível criar o vídeo de saída em {self.output_path}")
+            self._writer = None
+
+    def _measure_fps(self, pending):
+        """Estima a taxa real a partir dos instantes de entrega dos frames já recebidos."""
+        if len(pending) >= 2:
+            elapsed = pending[-1][1] - pending[0][1]
+            if elapsed > 0:
+                # Arredonda e limita a taxa: alguns codecs (ex: mpeg4) rejeitam bases de tempo com denominador grande
+                return round(min(max((len(pending) - 1) / elapsed, 1.0), 120.0), 2)
+        return self.default_fps
+
+    def _write(self, frame):
+        if (frame.shape[1], frame.shape[0]) != self.resolution:
+            frame = cv2.resize(frame, self.resolution, interpolation=cv2.INTER_AREA)
+
+        self._writer.write(frame)
+        self.frames_written += 1
+
+    def _start_writing(self, pending):
+        """Abre o arquivo e grava os frames acumulados. Retorna False se o arquivo não puder ser criado."""
+        if self.fps is None:
+            self.fps = self._measure_fps(pending)
+
+        self._open_writer(pending[0][0])
+        if self._writer is None:
+            return False
+
+        for frame, _ in pending:
+            self._write(frame)
+        return True
+
+    def _run(self):
+        """Loop da thread de escrita: consome a fila até receber o sinal de término (None)."""
+        failed = False
+        # Frames guardados até que a taxa de saída seja conhecida
+        pending = []
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            if failed:
+                continue
+
+            if self._writer is None:
+                pending.append(item)
+                if self.fps is None and len(pending) < self.fps_measure_frames:
+                    continue
+                failed = not self._start_writing(pending)
+                pending = []
+                continue
+
+            self._write(item[0])
+
+        # Sessões curtas podem terminar antes de completar a medição
+        if pending and not failed:
+            self._start_writing(pending)
+
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def close(self):
+        """
+        Finaliza a exportação: escreve os frames restantes na fila e fecha o arquivo corretamente.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        # O sinal de término precisa entrar na fila mesmo que ela esteja cheia. A espera é feita em
+        # intervalos curtos: se a thread de escrita tiver terminado com erro, ninguém mais consome a fila.
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+
+        # Se a thread terminou com erro, o arquivo ainda está aberto; fechá-lo grava o índice final do vídeo
+        if self._writer is not None:
+            print(f"Aviso: a exportação foi interrompida; {self.output_path} contém apenas os frames já gravados.")
+            self._writer.release()
+            self._writer = None
+
+        print(f"Vídeo exportado em {self.output_path}: {self.frames_written} frames gravados, "
+              f"{self.frames_dropped} frames descartados.")
@@ -0,0 +1,52 @@
+import argparse
+import json
+
+from src.parameter_sweep import load_manifest, build_configurations, run_sweep
+from config import SWEEP_CONFIG
+
+def main(manifest_path, grid_path=None, random_samples=None, seed=None, workers=None, output_path=None):
+    """
+    Varre combinações dos parâmetros do filtro de Kalman e dos limiares dos templates sobre
+    sessões de keypoints gravadas (.kpr), sem executar o detector novamente.
+    """
+    sessions = load_manifest(manifest_path)
+
+    grid = SWEEP_CONFIG['grid']
+    if grid_path:
+        with open(grid_path, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    configurations = build_configurations(grid, random_samples=random_samples, seed=seed)
+    print(f">>> Avaliando {len(configurations)} configurações em {len(sessions)} sessões...")
+
+    results = run_sweep(sessions, configurations, workers=workers)
+
+    # Uma tabela por template: cada exercício tem seus próprios limiares e parâmetros do filtro
+    for exercise_path, template_results in results.items():
+        session_count = sum(1 for session in sessions if session['exercise'] == exercise_path)
+        print(f"\n>>> Template: {exercise_path} ({session_count} sessões)")
+        print(f"{'#':>3}  {'Reps':>6}  {'Exatas':>6}  {'Prec.':>6}  {'Recall':>6}  {'F1':>6}  {'Tempo':>7}  Parâmetros")
+        for i, result in enumerate(template_results[:SWEEP_CONFIG['top']]):
+            params = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+            print(f"{i+1:>3}  {result['rep_accuracy']:>6.3f}  {result['rep_exact']:>6.3f}  "
+                  f"{result['error_precision']:>6.3f}  {result['error_recall']:>6.3f}  {result['error_f1']:>6.3f}  "
+                  f"{result['runtime_s']:>6.2f}s  {params}")
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados completos salvos em {output_path}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Varredura de parâmetros sobre sessões de keypoints gravadas.')
+    parser.add_argument('--manifest', type=str, required=True, help='Arquivo JSON com as gravações (.kpr), templates e rótulos de cada sessão.')
+    parser.add_argument('--grid', type=str, default=None, help='Arquivo JSON com a grade de parâmetros (padrão: SWEEP_CONFIG em config.py).')
+    parser.add_argument('--random', type=int, default=None, help='Avalia apenas N combinações sorteadas da grade (busca aleatória).')
+    parser.add_argument('--seed', type=int, default=None, help='Semente da busca aleatória.')
+    parser.add_argument('--workers', type=int, default=None, help='Quantidade de processos (padrão: número de CPUs).')
+    parser.add_argument('--output', type=str, default=None, help='Caminho para salvar todos os resultados em JSON.')
+
+    args = parser.parse_args()
+
+    main(args.manifest, grid_path=args.grid, random_samples=args.random, seed=args.seed,
+         workers=args.workers, output_path=args.output)